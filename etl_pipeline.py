@@ -6,10 +6,35 @@
 # ============================================================================
 
 import requests  # Used to make HTTP requests to GitHub API
+from requests.adapters import HTTPAdapter  # Connection pool for reusing sockets
+from urllib3.util import Retry  # Automatic retries for failed HTTP requests
 import json  # Used to work with JSON data format
 import csv  # Used to parse CSV files
-import base64  # GitHub API requires file content to be base64 encoded
-from io import StringIO  # Allows us to treat strings as file objects
+import gzip  # Used to compress the JSON before uploading
+import hashlib  # Used to compute Git's SHA for a file locally
+from binascii import b2a_base64  # Fast C base64 (GitHub API requires uploaded content to be base64 encoded)
+import os  # Used to check for the local load state file
+import sys  # Used to share one copy of each column name across all rows
+import time  # Used to wait for GitHub rate limits to reset
+from email.utils import parsedate_to_datetime  # Reads Retry-After given as a date
+import io  # Allows us to treat bytes in memory as file objects
+import tempfile  # Holds large upload bodies on disk instead of in memory
+import multiprocessing  # Used to start transform worker processes safely
+from contextlib import nullcontext  # Stands in for the process pool when there is none
+import math  # Used to reject "nan"/"inf" when detecting numeric columns
+from decimal import Decimal  # Used to split a float into its shortest digits
+import re  # Used to recognise plain numbers when detecting numeric columns
+from itertools import chain, islice  # Used to peek at the first CSV rows
+# Thread pool runs independent requests at the same time; process pool runs
+# CPU-heavy transforms on all CPU cores
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Optional: orjson turns Python data into JSON bytes several times faster than
+# the built-in json module. Without it we fall back to json.
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # ============================================================================
 # STEP 2: CONFIGURATION - Replace with your actual values
@@ -27,7 +52,67 @@ SOURCE_FILE_PATH = "stocks_toy.csv"  # Path to CSV file in source repo
 # Destination Repository Configuration (where JSON will be uploaded)
 DEST_OWNER = "Shazizan"  # GitHub username/org of destination repo
 DEST_REPO = "pipeline-vault"  # Name of destination repository
-DEST_FILE_PATH = "stocks_toy.json"  # Path where JSON will be saved
+DEST_FILE_PATH = "stocks_toy.json.gz"  # Path where JSON will be saved (use .json if COMPRESS_OUTPUT is off)
+DEST_BRANCH = "main"  # Branch the JSON is committed to
+
+# Files to process: (source CSV path, destination JSON path) pairs
+# This list decides what runs: with one pair that file is processed on its own,
+# with more than one all files are processed in parallel and uploaded
+# together in a single commit
+ETL_JOBS = [
+    (SOURCE_FILE_PATH, DEST_FILE_PATH),
+]
+
+# Maximum number of files processed (and requests in flight) at once
+# Keeps us well below GitHub's limits on concurrent requests
+MAX_CONCURRENCY = 8
+
+# Convert numeric CSV columns to JSON numbers (123.45) instead of text ("123.45")
+# Each column's type is decided from the first TYPE_SAMPLE_ROWS rows. A later
+# decimal in a whole-number column is still written as a number; a later value
+# that isn't a number at all is kept as text, so that column then mixes both
+INFER_TYPES = True
+TYPE_SAMPLE_ROWS = 100
+
+# Gzip the JSON before uploading (often 5-10x smaller for stock data)
+COMPRESS_OUTPUT = True
+
+# Shape of the JSON output:
+#   "records" → [{"col": value, ...}, ...]  (one object per row)
+#   "columns" → {"columns": [...], "data": [[value, ...], ...]}  (column names
+#               written once; smaller and faster, readable with
+#               pandas.read_json(orient="split"))
+JSON_LAYOUT = "records"
+
+# Set to True to pretty-print the uploaded JSON (bigger file, easier to read)
+PRETTY_JSON = False
+
+# Seconds to wait for GitHub to connect/respond before giving up on a request
+# (requests has no default timeout, so a stalled connection would hang forever)
+HTTP_TIMEOUT = 30
+
+# Bytes base64-encoded at a time when building an upload (a multiple of 3, so
+# the encoded pieces join up without padding in between)
+BASE64_CHUNK_SIZE = 57000
+
+# Rate limit handling: when fewer than RATE_LIMIT_LOW requests are left and
+# the limit resets within RATE_LIMIT_MAX_WAIT seconds, pause until it resets.
+# A rate-limited request is only retried if the wait is at most
+# RATE_LIMIT_MAX_WAIT seconds; otherwise the error is reported straight away
+RATE_LIMIT_LOW = 100
+RATE_LIMIT_MAX_WAIT = 60
+RATE_LIMIT_RETRIES = 3  # How many times to wait out a rate-limited (403/429) response
+
+# Local file remembering the SHA of each uploaded file from the last run
+# Lets the load step update the file without first asking GitHub for its SHA
+# Defaults to a file next to this script; set the LOAD_STATE_FILE environment
+# variable to an absolute path to move it (e.g. /tmp/load_state.json on Lambda,
+# where the code directory is read-only). It is only a cache: if it can't be
+# read or written the pipeline simply runs without it.
+LOAD_STATE_FILE = os.environ.get(
+    "LOAD_STATE_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "load_state.json")
+)
 
 # ============================================================================
 # STEP 3: LAMBDA FUNCTIONS FOR ETL PROCESS
@@ -41,64 +126,359 @@ create_headers = lambda token: {
     "Content-Type": "application/json"  # Tells GitHub we're sending JSON
 }
 
+# Headers for our token, built once and shared by every request
+HEADERS = create_headers(GITHUB_TOKEN)
+
+# Function to create a reusable HTTP session
+# Purpose: One session keeps the TLS connection to api.github.com open,
+# so every request after the first skips the connection handshake
+def create_session(headers=HEADERS):
+    session = requests.Session()
+    session.headers.update(headers)  # Sent with every request
+    # Retry server errors and 429s with exponential backoff (1s, 2s, 4s, ...)
+    retries = Retry(
+        total=6,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "PUT", "POST", "PATCH"],
+        respect_retry_after_header=True,
+        raise_on_status=False  # Hand back the last response so we can report it
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONCURRENCY, max_retries=retries))
+    return session
+
+# Lambda function to get the seconds left until the rate limit resets
+# Purpose: GitHub sends the reset time as a Unix timestamp
+seconds_until_reset = lambda response: max(0, int(response.headers.get("X-RateLimit-Reset", 0)) - int(time.time()))
+
+# Function to get how long a rate-limited response asks us to wait
+# Purpose: Retry-After may be a number of seconds or an HTTP date; without it
+# we wait until the rate limit resets
+def rate_limit_wait(response):
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is None:
+        return seconds_until_reset(response)
+    if retry_after.strip().isdigit():
+        return int(retry_after)
+    try:
+        return max(0, int(parsedate_to_datetime(retry_after).timestamp() - time.time()))
+    except (TypeError, ValueError):
+        return seconds_until_reset(response)
+
+# Function to send a GitHub API request and respect its rate limits
+# Purpose: Every API call goes through here so rate limits are handled in one place
+def github_request(session, method, url, **kwargs):
+    kwargs.setdefault("timeout", HTTP_TIMEOUT)
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        # A file body must be rewound so a retry sends it again from the start
+        if hasattr(kwargs.get("data"), "seek"):
+            kwargs["data"].seek(0)
+        response = session.request(method, url, **kwargs)
+        remaining = int(response.headers.get("X-RateLimit-Remaining", RATE_LIMIT_LOW))
+        
+        # A 403/429 with no requests left (or a Retry-After) is a rate limit,
+        # not a permission problem: wait it out (if not too long) and try again
+        rate_limited = remaining == 0 or "Retry-After" in response.headers
+        if response.status_code in [403, 429] and rate_limited and attempt < RATE_LIMIT_RETRIES:
+            wait = rate_limit_wait(response)
+            if wait > RATE_LIMIT_MAX_WAIT:
+                print(f"⏳ Rate limited by GitHub for another {wait}s, not waiting")
+                return response
+            print(f"⏳ Rate limited by GitHub, waiting {wait}s...")
+            response.close()
+            time.sleep(wait)
+            continue
+        
+        # Nearly out of requests and the limit resets soon: pause until it does
+        wait = seconds_until_reset(response)
+        if remaining < RATE_LIMIT_LOW and 0 < wait <= RATE_LIMIT_MAX_WAIT:
+            print(f"⏳ Only {remaining} GitHub requests left, waiting {wait}s for reset...")
+            time.sleep(wait)
+        
+        return response
+
 # Lambda function to construct GitHub API URL
 # Purpose: Builds the correct URL to access files in a repository
 build_url = lambda owner, repo, path: f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
 
-# Lambda function to decode base64 content
-# Purpose: GitHub returns file content in base64, this decodes it to text
-decode_content = lambda content: base64.b64decode(content).decode('utf-8')
+# Lambda function to construct GitHub Git Data API URL
+# Purpose: Builds URLs for low-level blob/tree/commit/ref endpoints
+build_git_url = lambda owner, repo, endpoint: f"https://api.github.com/repos/{owner}/{repo}/git/{endpoint}"
+
+# Function to check a GitHub API response and return its JSON
+# Purpose: Raises a readable error when a request fails
+def github_json(response, action):
+    if response.status_code in [200, 201]:
+        return response.json()
+    raise Exception(f"❌ Failed to {action}: {response.status_code} - {response.text}")
+
+# Function to write a JSON upload body with base64 content to a temporary file
+# Purpose: GitHub requires file uploads to be base64 encoded; encoding piece by
+# piece straight into a file means neither the encoded copy nor the JSON
+# payload wrapped around it has to fit in memory
+def build_upload_body(content, fields):
+    body = tempfile.TemporaryFile()
+    body.write(b'{"content":"')
+    view = memoryview(content)  # Slicing a memoryview doesn't copy the bytes
+    for start in range(0, len(view), BASE64_CHUNK_SIZE):
+        body.write(b2a_base64(view[start:start + BASE64_CHUNK_SIZE], newline=False))
+    body.write(b'"')
+    for name, value in fields.items():
+        body.write(f",{json.dumps(name)}:{json.dumps(value)}".encode('utf-8'))
+    body.write(b'}')
+    body.seek(0)
+    return body
+
+# Patterns for values that are safe to turn into JSON numbers: plain digits
+# only, so "1_000", " 5 " or zero-padded codes like "02134" stay as text
+INT_PATTERN = re.compile(r"-?(?:0|[1-9][0-9]*)")
+FLOAT_PATTERN = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?")
+
+# Function to convert a plain whole number to int
+# Purpose: Rejects anything else, and numbers too big for a 64-bit integer
+# (most JSON readers, orjson included, can't handle those)
+def to_int(value):
+    if INT_PATTERN.fullmatch(value):
+        number = int(value)
+        if -2**63 <= number < 2**63:
+            return number
+    raise ValueError(f"not a 64-bit integer: {value!r}")
+
+# Function to convert a plain decimal number to float
+# Purpose: Rejects anything else, values that overflow to infinity, and whole
+# numbers too long to store exactly as a float (e.g. long ID numbers)
+def to_float(value):
+    if INT_PATTERN.fullmatch(value):
+        number = int(value)
+        if abs(number) <= 2**53:
+            return float(number)
+    elif FLOAT_PATTERN.fullmatch(value):
+        number = float(value)
+        if math.isfinite(number):
+            return number
+    raise ValueError(f"not a plain decimal number: {value!r}")
+
+# Function to check whether every value converts cleanly with a given type
+# Purpose: Decides if a CSV column holds whole numbers, decimals or text
+def all_convert(values, cast):
+    try:
+        for value in values:
+            cast(value)
+    except ValueError:
+        return False
+    return True
+
+# Function to pick a type for each column from a sample of rows
+# Purpose: Tries int, then float, and falls back to text (str)
+def infer_casters(column_count, sample):
+    casters = []
+    for i in range(column_count):
+        values = [row[i] for row in sample if i < len(row)]
+        casters.append(next((cast for cast in (to_int, to_float) if values and all_convert(values, cast)), str))
+    return casters
+
+# Function to convert one CSV value to its column's type
+# Purpose: Widens whole numbers to decimals when a later row needs it, and
+# keeps the original text if a later row isn't a number at all
+def convert(cast, value):
+    if cast is str:
+        return value
+    try:
+        return cast(value)
+    except ValueError:
+        pass
+    if cast is to_int:
+        try:
+            return to_float(value)
+        except ValueError:
+            pass
+    return value
+
+# Function to parse CSV into its header and an iterator of row lists
+# Purpose: Decodes and parses the CSV as it is read, without a full text copy,
+# and without building a dictionary per row (that is left to the caller)
+def read_rows(csv_file):
+    reader = csv.reader(io.TextIOWrapper(csv_file, encoding='utf-8', newline=''))
+    reader = filter(None, reader)  # Skip blank lines (csv gives them as [])
+    header = tuple(map(sys.intern, next(reader, [])))  # First row holds the column names
+    
+    if not INFER_TYPES:
+        return header, reader
+    
+    # Look at the first rows to choose each column's type, then convert
+    # every row (including the sampled ones) as it streams past
+    sample = list(islice(reader, TYPE_SAMPLE_ROWS))
+    casters = infer_casters(len(header), sample)
+    rows = ([convert(cast, value) for cast, value in zip(casters, row)] for row in chain(sample, reader))
+    return header, rows
+
+# Function to write a float exactly the way orjson does
+# Purpose: The built-in json module writes some floats differently (1e+16 vs
+# 1e16, 1e-05 vs 0.00001); matching orjson keeps the uploaded bytes, and so
+# the file's SHA, the same whether or not orjson is installed
+def format_float(value):
+    # Without an exponent (1e-4 <= |value| < 1e16) Python already writes it
+    # the same way, including 0.0 and -0.0
+    text = repr(value)
+    if "e" not in text:
+        return text
+    
+    # Shortest digits that round-trip (the same digits orjson picks)
+    sign, digits, exponent = Decimal(text).as_tuple()
+    digits = "".join(map(str, digits))
+    stripped = digits.rstrip("0")
+    exponent += len(digits) - len(stripped)
+    digits = stripped
+    point = len(digits) + exponent  # Position of the decimal point
+    sign = "-" if sign else ""
+    
+    if 0 <= exponent and point <= 16:  # 1200.0
+        return f"{sign}{digits}{'0' * exponent}.0"
+    if 0 < point <= 16:  # 12.34
+        return f"{sign}{digits[:point]}.{digits[point:]}"
+    if -5 < point <= 0:  # 0.001234
+        return f"{sign}0.{'0' * -point}{digits}"
+    mantissa = digits if len(digits) == 1 else f"{digits[0]}.{digits[1:]}"
+    return f"{sign}{mantissa}e{point - 1}"  # 1.234e-7, 1e16
+
+# Function to write a string as a JSON string (non-ASCII kept as-is)
+# Purpose: The same escaping json.dumps(..., ensure_ascii=False) uses, without
+# its per-call overhead
+encode_string = json.encoder.encode_basestring
+
+# Function to write data as JSON text the same way orjson does
+# Purpose: Fallback encoder when orjson isn't installed; strings, numbers and
+# layout come out byte-for-byte like orjson's (indent is 2 or None)
+def write_json(value, write, indent=None, depth=0):
+    if isinstance(value, str):
+        write(encode_string(value))
+    elif type(value) is int:  # (not bool, which is a kind of int)
+        write(int.__repr__(value))
+    elif isinstance(value, float):
+        write(format_float(value))
+    elif isinstance(value, (dict, list, tuple)):
+        is_dict = isinstance(value, dict)
+        opening, closing = "{}" if is_dict else "[]"
+        if not value:
+            write(opening + closing)
+            return
+        newline = "\n" + " " * (indent * (depth + 1)) if indent else ""
+        write(opening)
+        for i, item in enumerate(value.items() if is_dict else value):
+            if i:
+                write(",")
+            write(newline)
+            if is_dict:
+                key, item = item
+                write(encode_string(key))
+                write(": " if indent else ":")
+            write_json(item, write, indent, depth + 1)
+        if indent:
+            write("\n" + " " * (indent * depth))
+        write(closing)
+    else:
+        write(json.dumps(value, ensure_ascii=False))
+
+# Function to convert list to JSON bytes
+# Purpose: Writes compact JSON as UTF-8 bytes, ready for base64 (no spaces or
+# newlines, and non-ASCII text kept as-is instead of \uXXXX). orjson and the
+# json fallback produce identical bytes
+def to_json(data):
+    if orjson is not None:
+        # orjson already returns compact UTF-8 bytes
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if PRETTY_JSON else 0)
+    
+    if PRETTY_JSON:
+        text = json.dumps(data, indent=2, ensure_ascii=False)
+    else:
+        text = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+    
+    # json only differs from orjson on floats it writes with an exponent
+    # (always "e+" or "e-"); if there may be any, use the exact encoder
+    if "e+" in text or "e-" in text:
+        pieces = []
+        write_json(data, pieces.append, indent=2 if PRETTY_JSON else None)
+        text = "".join(pieces)
+    return text.encode('utf-8')
 
-# Lambda function to encode content to base64
-# Purpose: GitHub requires file uploads to be base64 encoded
-encode_content = lambda content: base64.b64encode(content.encode('utf-8')).decode('utf-8')
+# Function to compute the SHA Git (and GitHub) gives a file's content
+# Purpose: Lets us tell whether the remote file already has identical content
+def git_blob_sha(content):
+    h = hashlib.sha1()
+    h.update(f"blob {len(content)}\0".encode('ascii'))
+    h.update(content)
+    return h.hexdigest()
 
-# Lambda function to parse CSV to list of dictionaries
-# Purpose: Converts CSV rows into Python dictionaries for easy manipulation
-parse_csv = lambda csv_text: list(csv.DictReader(StringIO(csv_text)))
+# Lambda function to build the key used in the load state file
+# Purpose: Identifies a destination file across repositories
+state_key = lambda owner, repo, path: f"{owner}/{repo}/{path}"
 
-# Lambda function to convert list to JSON string
-# Purpose: Transforms Python data structure into formatted JSON
-to_json = lambda data: json.dumps(data, indent=2)  # indent=2 makes it readable
+# Function to read the cached file SHAs from the load state file
+# Purpose: Returns an empty mapping on the first run (no file yet), or if
+# the file can't be read or is corrupt
+def read_load_state():
+    if not os.path.exists(LOAD_STATE_FILE):
+        return {}
+    try:
+        with open(LOAD_STATE_FILE) as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable load state file: {e}")
+        return {}
+    return state if isinstance(state, dict) else {}
+
+# Function to remember the SHA GitHub assigned to an uploaded file
+# Purpose: The next run can send this SHA straight away with its PUT
+# (a failure to save is reported but never fails a run whose upload worked)
+def save_load_state(key, sha):
+    state = read_load_state()
+    state[key] = sha
+    try:
+        with open(LOAD_STATE_FILE, "w") as f:
+            json.dump(state, f, indent=2)
+    except OSError as e:
+        print(f"⚠️ Could not save load state file: {e}")
 
 # ============================================================================
 # STEP 4: EXTRACT FUNCTION
 # ============================================================================
 
-def extract_csv_from_github(owner, repo, file_path, token):
+def extract_csv_from_github(session, owner, repo, file_path):
     """
     Extract CSV data from GitHub repository
     
     Args:
+        session: Authenticated requests session (see create_session)
         owner: GitHub username or organization
         repo: Repository name
         file_path: Path to file within repository
-        token: GitHub personal access token
     
     Returns:
-        String content of the CSV file
+        Binary file-like stream of the CSV file, read as it downloads
+        (the caller closes it when done)
     """
     
     # Build the API URL for the file
     url = build_url(owner, repo, file_path)
     
-    # Create authentication headers
-    headers = create_headers(token)
-    
-    # Make GET request to GitHub API
+    # Make GET request to GitHub API (session already carries auth headers)
+    # The "raw" media type returns the file itself instead of base64 inside
+    # JSON, and stream=True lets the transform step read it as it arrives
     print(f"📥 Extracting data from: {owner}/{repo}/{file_path}")
-    response = requests.get(url, headers=headers)
+    response = github_request(session, "GET", url, headers={"Accept": "application/vnd.github.raw"}, stream=True)
     
     # Check if request was successful
     if response.status_code == 200:
-        # Parse the JSON response
-        file_data = response.json()
+        # Undo any gzip transfer encoding while reading the stream
+        response.raw.decode_content = True
         
-        # Decode the base64 content to get actual CSV text
-        csv_content = decode_content(file_data['content'])
+        # Keep the stream open at end of data: io.TextIOWrapper (used by the
+        # csv reader) reads once more after the last byte and would otherwise
+        # fail on a stream urllib3 already closed
+        response.raw.auto_close = False
         
         print("✅ Extraction successful!")
-        return csv_content
+        return response.raw
     else:
         # If request failed, raise an error with details
         raise Exception(f"❌ Failed to extract: {response.status_code} - {response.text}")
@@ -107,141 +487,407 @@ def extract_csv_from_github(owner, repo, file_path, token):
 # STEP 5: TRANSFORM FUNCTION
 # ============================================================================
 
-def transform_csv_to_json(csv_content):
+def transform_csv_to_json(csv_file):
     """
     Transform CSV content to JSON format
     
     Args:
-        csv_content: String content of CSV file
+        csv_file: Binary file-like object with the CSV content
     
     Returns:
-        JSON string representation of the data
+        JSON bytes representation of the data (gzipped if COMPRESS_OUTPUT)
     """
     
     print("🔄 Transforming CSV to JSON...")
     
-    # Parse CSV text into list of dictionaries using lambda function
-    data = parse_csv(csv_content)
+    # Parse CSV into column names plus a list of row values
+    header, rows = read_rows(csv_file)
+    rows = list(rows)
     
-    # Convert to JSON string using lambda function
+    # Pair every row with the column names only if the layout needs it
+    if JSON_LAYOUT == "columns":
+        data = {"columns": list(header), "data": rows}
+    else:
+        data = [dict(zip(header, row)) for row in rows]
+    
+    # Convert to JSON bytes
     json_content = to_json(data)
+    row_count = len(rows)
+    
+    # Compress the JSON; mtime=0 keeps the output identical for identical data
+    if COMPRESS_OUTPUT:
+        json_content = gzip.compress(json_content, compresslevel=6, mtime=0)
     
-    print(f"✅ Transformation complete! Converted {len(data)} rows")
+    print(f"✅ Transformation complete! Converted {row_count} rows")
     return json_content
 
 # ============================================================================
 # STEP 6: LOAD FUNCTION
 # ============================================================================
 
-def load_json_to_github(owner, repo, file_path, json_content, token, commit_message="ETL: Upload transformed data"):
+def fetch_dest_sha(session, owner, repo, file_path):
+    """
+    Look up the SHA of a file already stored on GitHub
+    
+    Args:
+        session: Authenticated requests session (see create_session)
+        owner: GitHub username or organization
+        repo: Repository name
+        file_path: Path to file within repository
+    
+    Returns:
+        SHA string of the file, or None if the file does not exist yet
+    """
+    
+    # Read the file from the branch we commit to, not the repo's default branch
+    response = github_request(session, "GET", build_url(owner, repo, file_path), params={"ref": DEST_BRANCH})
+    return response.json()['sha'] if response.status_code == 200 else None
+
+def load_json_to_github(session, owner, repo, file_path, json_content, commit_message="ETL: Upload transformed data", sha=None):
     """
     Load JSON data to GitHub repository
     
     Args:
+        session: Authenticated requests session (see create_session)
         owner: GitHub username or organization
         repo: Repository name
         file_path: Path where file should be saved
-        json_content: JSON string to upload
-        token: GitHub personal access token
+        json_content: JSON bytes to upload
         commit_message: Git commit message
+        sha: SHA of the existing file as just read from GitHub, if known
+            (defaults to the SHA cached from the last run)
     
     Returns:
-        Response from GitHub API
+        Response from GitHub API, or None if the file was already up to date
     """
     
     print(f"📤 Loading data to: {owner}/{repo}/{file_path}")
     
     # Build the API URL for destination
     url = build_url(owner, repo, file_path)
+    key = state_key(owner, repo, file_path)
+    content_sha = git_blob_sha(json_content)
     
-    # Create authentication headers
-    headers = create_headers(token)
-    
-    # First, check if file already exists (to get SHA for update)
-    check_response = requests.get(url, headers=headers)
-    
-    # Prepare the payload for GitHub API
+    # Prepare the payload for GitHub API (the base64 encoded content is
+    # added by build_upload_body when the request is sent)
     payload = {
         "message": commit_message,  # Git commit message
-        "content": encode_content(json_content),  # Base64 encoded content
-        "branch": "main"  # Target branch (change if needed)
+        "branch": DEST_BRANCH  # Target branch (set in configuration)
     }
     
-    # If file exists, we need to include its SHA for update
-    if check_response.status_code == 200:
-        payload["sha"] = check_response.json()['sha']
-        print("📝 File exists, updating...")
-    else:
-        print("📝 Creating new file...")
+    # Send the PUT with the body streamed from a temporary file
+    def put_file():
+        with build_upload_body(json_content, payload) as body:
+            return github_request(session, "PUT", url, data=body)
+    
+    # Without a SHA from GitHub, use the one remembered from the last run
+    if sha is None:
+        sha = read_load_state().get(key)
+        
+        # The cache says the file already holds this content, but it may have
+        # been edited since: confirm with one GET (far cheaper than a commit)
+        if sha == content_sha:
+            sha = fetch_dest_sha(session, owner, repo, file_path)
+    
+    # A SHA read from GitHub tells us what the file holds right now: if it
+    # matches our content there is nothing to upload
+    if sha == content_sha:
+        save_load_state(key, sha)
+        print("✅ No change, file already up to date!")
+        return None
+    
+    if sha:
+        payload["sha"] = sha
+        print("📝 Updating file using known SHA...")
     
     # Make PUT request to create/update file
-    response = requests.put(url, headers=headers, json=payload)
+    response = put_file()
+    
+    # 409/422 means our SHA is missing or stale (e.g. the file was edited
+    # elsewhere), so look up the current SHA and try once more
+    if response.status_code in [409, 422]:
+        sha = fetch_dest_sha(session, owner, repo, file_path)
+        if sha == content_sha:
+            save_load_state(key, sha)
+            print("✅ No change, file already up to date!")
+            return None
+        elif sha:
+            payload["sha"] = sha
+            print("📝 File exists, updating...")
+        else:
+            payload.pop("sha", None)
+            print("📝 Creating new file...")
+        response = put_file()
     
     # Check if upload was successful
     if response.status_code in [200, 201]:
+        result = response.json()
+        save_load_state(key, result['content']['sha'])
         print("✅ Load successful!")
-        return response.json()
+        return result
     else:
         raise Exception(f"❌ Failed to load: {response.status_code} - {response.text}")
 
+def load_many_to_github(session, owner, repo, files, commit_message="ETL: Upload transformed data"):
+    """
+    Load several JSON files to GitHub repository in a single commit
+    
+    Uses the Git Data API (blobs → tree → commit → ref), so N files cost
+    N + 5 requests and one commit, instead of one commit per file
+    
+    Args:
+        session: Authenticated requests session (see create_session)
+        owner: GitHub username or organization
+        repo: Repository name
+        files: List of (file_path, json_content) pairs to upload
+        commit_message: Git commit message
+    
+    Returns:
+        New commit data from GitHub API (the current commit if nothing changed)
+    """
+    
+    print(f"📤 Loading {len(files)} files to: {owner}/{repo}")
+    
+    # Find the commit the branch currently points to
+    ref = github_json(github_request(session, "GET", build_git_url(owner, repo, f"ref/heads/{DEST_BRANCH}")), "read branch")
+    base_sha = ref['object']['sha']
+    base_commit = github_json(github_request(session, "GET", build_git_url(owner, repo, f"commits/{base_sha}")), "read commit")
+    
+    # Upload each file's content as a blob (independent, so run them together)
+    def create_blob(content):
+        with build_upload_body(content, {"encoding": "base64"}) as body:
+            return github_json(github_request(session, "POST", build_git_url(owner, repo, "blobs"), data=body), "create blob")['sha']
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENCY) as pool:
+        blob_shas = list(pool.map(create_blob, [content for _, content in files]))
+    
+    # Build a tree placing every blob at its path on top of the current tree
+    tree = github_json(github_request(session, "POST", build_git_url(owner, repo, "trees"), json={
+        "base_tree": base_commit['tree']['sha'],
+        "tree": [
+            {"path": path, "mode": "100644", "type": "blob", "sha": sha}
+            for (path, _), sha in zip(files, blob_shas)
+        ]
+    }), "create tree")
+    
+    # Same tree as the current commit means no file changed: skip the commit
+    if tree['sha'] == base_commit['tree']['sha']:
+        print("✅ No change, files already up to date!")
+        return base_commit
+    
+    # Commit the tree and move the branch to the new commit
+    commit = github_json(github_request(session, "POST", build_git_url(owner, repo, "commits"), json={
+        "message": commit_message,
+        "tree": tree['sha'],
+        "parents": [base_sha]
+    }), "create commit")
+    github_json(github_request(session, "PATCH", build_git_url(owner, repo, f"refs/heads/{DEST_BRANCH}"), json={"sha": commit['sha']}), "update branch")
+    
+    # Blob SHAs are the same SHAs the contents API uses, so keep the cache fresh
+    for (path, _), sha in zip(files, blob_shas):
+        save_load_state(state_key(owner, repo, path), sha)
+    
+    print("✅ Load successful!")
+    return commit
+
 # ============================================================================
 # STEP 7: MAIN ETL PIPELINE
 # ============================================================================
 
-def run_etl_pipeline():
+def check_jobs(jobs):
+    """
+    Make sure there is at least one file to process
+    
+    Args:
+        jobs: List of (source CSV path, destination JSON path) pairs
+    """
+    
+    if not jobs:
+        raise Exception("❌ ETL_JOBS is empty: add a (source CSV path, destination JSON path) pair")
+
+def run_etl_pipeline(jobs=ETL_JOBS):
     """
     Execute the complete ETL pipeline
     
-    This function orchestrates the Extract, Transform, Load process
+    This function orchestrates the Extract, Transform, Load process for the
+    first (and normally only) pair in ETL_JOBS
     """
     
+    check_jobs(jobs)
+    source_path, dest_path = jobs[0]
+    
     print("\n" + "="*60)
     print("🚀 Starting ETL Pipeline: GitHub CSV → JSON Transfer")
     print("="*60 + "\n")
     
+    # One session for the whole run so all requests share a connection
+    session = create_session()
+    
     try:
-        # EXTRACT: Get CSV data from source repository
-        csv_data = extract_csv_from_github(
-            owner=SOURCE_OWNER,
-            repo=SOURCE_REPO,
-            file_path=SOURCE_FILE_PATH,
-            token=GITHUB_TOKEN
-        )
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            # EXTRACT: Get CSV data from source repository
+            csv_future = pool.submit(
+                extract_csv_from_github,
+                session,
+                owner=SOURCE_OWNER,
+                repo=SOURCE_REPO,
+                file_path=source_path
+            )
+            
+            # Meanwhile, look up the destination file's SHA (unless cached)
+            # so the load step can go straight to the upload
+            sha_future = None
+            if not read_load_state().get(state_key(DEST_OWNER, DEST_REPO, dest_path)):
+                sha_future = pool.submit(
+                    fetch_dest_sha,
+                    session,
+                    owner=DEST_OWNER,
+                    repo=DEST_REPO,
+                    file_path=dest_path
+                )
+            
+            csv_data = csv_future.result()
+            dest_sha = sha_future.result() if sha_future else None
         
         print()  # Empty line for readability
         
-        # TRANSFORM: Convert CSV to JSON
-        json_data = transform_csv_to_json(csv_data)
+        # TRANSFORM: Convert CSV to JSON (closing the download stream after)
+        with csv_data:
+            json_data = transform_csv_to_json(csv_data)
         
         print()  # Empty line for readability
         
         # LOAD: Upload JSON to destination repository
         result = load_json_to_github(
+            session,
             owner=DEST_OWNER,
             repo=DEST_REPO,
-            file_path=DEST_FILE_PATH,
+            file_path=dest_path,
             json_content=json_data,
-            token=GITHUB_TOKEN,
-            commit_message="ETL Pipeline: Automated CSV to JSON conversion"
+            commit_message="ETL Pipeline: Automated CSV to JSON conversion",
+            sha=dest_sha
         )
         
         print("\n" + "="*60)
         print("🎉 ETL Pipeline completed successfully!")
         print("="*60)
-        print(f"\n📊 File uploaded to: {result['content']['html_url']}")
+        if result:
+            print(f"\n📊 File uploaded to: {result['content']['html_url']}")
         
     except Exception as e:
         print("\n" + "="*60)
         print(f"💥 ETL Pipeline failed: {str(e)}")
         print("="*60)
+    
+    finally:
+        # Release the pooled connections
+        session.close()
+
+def etl_one(session, transform_pool, source_path, dest_path):
+    """
+    Extract and transform a single file of a multi-file run
+    
+    Args:
+        session: Authenticated requests session (see create_session)
+        transform_pool: Process pool that runs the CPU-heavy transform step
+            (None to transform in the calling thread)
+        source_path: Path to CSV file in source repo
+        dest_path: Path where JSON will be saved in destination repo
+    
+    Returns:
+        (dest_path, json_content) pair, ready for load_many_to_github
+    """
+    
+    # Download the whole CSV here: an open network stream can't be handed to
+    # another process, but a bytes buffer can
+    with extract_csv_from_github(session, SOURCE_OWNER, SOURCE_REPO, source_path) as stream:
+        csv_data = stream.read()
+    
+    # Transform in a separate process so several files use several CPU cores
+    # (threads alone would take turns because of Python's GIL)
+    if transform_pool is None:
+        json_data = transform_csv_to_json(io.BytesIO(csv_data))
+    else:
+        json_data = transform_pool.submit(transform_csv_to_json, io.BytesIO(csv_data)).result()
+    return dest_path, json_data
+
+def create_transform_pool():
+    """
+    Start the process pool used to transform files in parallel
+    
+    Workers are started with "spawn" (a fresh interpreter) rather than
+    fork(): forking while download threads hold locks (stdout, the connection
+    pool) can leave a child process stuck on a copied lock
+    
+    Returns:
+        ProcessPoolExecutor, or None where processes can't be used (e.g. AWS
+        Lambda, which has no /dev/shm); transforms then run on the threads
+    """
+    
+    try:
+        return ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+    except OSError as e:
+        print(f"⚠️ Process pool unavailable ({e}), transforming on threads instead")
+        return None
+
+def run_etl_many(jobs=ETL_JOBS):
+    """
+    Execute the ETL pipeline for several files at once
+    
+    Every file is extracted in parallel (at most MAX_CONCURRENCY at a time)
+    and transformed in a pool of processes (one per CPU core, or on the
+    download threads where processes aren't available), then all results are
+    loaded in one commit
+    """
+    
+    check_jobs(jobs)
+    
+    print("\n" + "="*60)
+    print(f"🚀 Starting ETL Pipeline: {len(jobs)} GitHub CSV → JSON Transfers")
+    print("="*60 + "\n")
+    
+    session = create_session()
+    
+    try:
+        # EXTRACT + TRANSFORM: download on threads, transform on processes
+        # (or on the same threads where a process pool can't be started)
+        with create_transform_pool() or nullcontext() as transform_pool, ThreadPoolExecutor(max_workers=MAX_CONCURRENCY) as pool:
+            files = list(pool.map(lambda job: etl_one(session, transform_pool, *job), jobs))
+        
+        print()  # Empty line for readability
+        
+        # LOAD: Upload every JSON file to destination repository in one commit
+        commit = load_many_to_github(
+            session,
+            owner=DEST_OWNER,
+            repo=DEST_REPO,
+            files=files,
+            commit_message=f"ETL Pipeline: Automated CSV to JSON conversion of {len(files)} files"
+        )
+        
+        print("\n" + "="*60)
+        print("🎉 ETL Pipeline completed successfully!")
+        print("="*60)
+        print(f"\n📊 Files committed in: {commit['html_url']}")
+        
+    except Exception as e:
+        print("\n" + "="*60)
+        print(f"💥 ETL Pipeline failed: {str(e)}")
+        print("="*60)
+    
+    finally:
+        # Release the pooled connections
+        session.close()
 
 # ============================================================================
 # STEP 8: EXECUTE THE PIPELINE
 # ============================================================================
 
 if __name__ == "__main__":
-    # Run the ETL pipeline
-    run_etl_pipeline()
+    # Run the ETL pipeline (several files go through the multi-file version)
+    if len(ETL_JOBS) > 1:
+        run_etl_many()
+    else:
+        run_etl_pipeline()
 
 # ============================================================================
 # ADDITIONAL HELPER FUNCTIONS (Optional but useful)